@@ -1,224 +1,494 @@
+import os
 import time
-import requests
-import json
+import queue
+import atexit
+import random
+import socket
+import inspect
+import asyncio
+import logging
+import logging.handlers
+import itertools
+import multiprocessing
 import concurrent.futures
-import statistics
+from collections import Counter
+import aiohttp
+import orjson
+import numpy as np
 from datetime import datetime
 
+try:
+    # libuv-backed event loop; uvloop.run avoids the loop-policy API deprecated in Python 3.12+
+    from uvloop import run as run_async
+except ImportError:
+    # uvloop is unavailable on Windows; fall back to the default asyncio loop
+    run_async = asyncio.run
+
+# Per-request errors are handed to a background thread so writing them never blocks a measurement
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+log = logging.getLogger("perf")
+log.addHandler(logging.handlers.QueueHandler(_log_queue))
+log.setLevel(logging.INFO)
+log.propagate = False
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def _request(session, method, url, body=None, timeout=10, limit=None):
+    """Issue a single request with a pre-encoded JSON body and return its status code and latency in ms"""
+    if limit is not None:
+        # Wait for a free slot first so client-side queueing is not counted as latency
+        async with limit:
+            return await _request(session, method, url, body, timeout)
+    
+    start_ns = time.perf_counter_ns()
+    async with session.request(
+        method,
+        url,
+        data=body,
+        headers=JSON_HEADERS if body is not None else None,
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as response:
+        await response.read()
+        return response.status, (time.perf_counter_ns() - start_ns) / 1e6
+
+
+def _socket_factory(addr_info):
+    """Open client sockets with TCP keep-alive enabled"""
+    family, type_, proto, _, _ = addr_info
+    sock = socket.socket(family=family, type=type_, proto=proto)
+    # Nagle needs no handling here: aiohttp sets TCP_NODELAY on every connection it makes
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    return sock
+
+
+# socket_factory was added in aiohttp 3.12; older versions keep their default sockets
+_CONNECTOR_SOCKET_KWARGS = (
+    {'socket_factory': _socket_factory}
+    if 'socket_factory' in inspect.signature(aiohttp.TCPConnector).parameters
+    else {}
+)
+
+
+def _format_errors(errors):
+    """Render an error histogram as e.g. '5x TimeoutError, 2x 503'"""
+    return ", ".join(f"{count}x {error}" for error, count in errors.most_common())
+
+
+def _load_worker(args):
+    """Run a load-test shard in a worker process on its own event loop"""
+    base_url, max_connections, seed, *load_args = args
+    tester = PerformanceTester(base_url, max_connections, seed)
+    return run_async(tester._run_load(*load_args))
+
+
 class PerformanceTester:
-    def __init__(self, base_url="http://localhost:3000"):
+    def __init__(self, base_url="http://localhost:3000", max_connections=40, seed=42):
         self.base_url = base_url
-        self.results = {
-            'prediction_tests': [],
-            'trading_tests': [],
-            'api_tests': [],
-            'load_tests': []
-        }
-    
-    def test_prediction_performance(self, num_tests=100):
-        """Test carbon prediction API performance"""
-        print(f"Testing prediction performance with {num_tests} requests...")
+        self.max_connections = max_connections
+        self.seed = seed
+        # Seeded so that the request key sequence is reproducible between runs
+        self.rng = random.Random(seed)
         
-        test_data = {
+        # The prediction payload is fixed, so it is serialised once per tester
+        self._pred_body = orjson.dumps({
             "energyUsage": 800,
             "transportation": {"weeklyMiles": 100, "vehicleType": "gasoline"},
             "diet": "mixed",
             "householdSize": 3,
             "wasteGeneration": 20,
             "heatingType": "gas"
+        })
+        # Buy/sell order bodies only vary in quantity and price, filled in with %
+        self._order_templates = (
+            b'{"orderType":"buy","quantity":%d,"price":%d,"creditId":"test-credit-id"}',
+            b'{"orderType":"sell","quantity":%d,"price":%d,"creditId":"test-credit-id"}'
+        )
+        self.results = {
+            'prediction_tests': [],
+            'trading_tests': [],
+            'api_tests': {},
+            'load_tests': []
         }
+    
+    def _client_session(self, pool_size=None):
+        """Create an aiohttp session whose keep-alive pool is shared by all requests of a test"""
+        pool_size = pool_size or self.max_connections
+        # Excess requests wait for a pooled connection instead of opening new ones
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=pool_size,
+                limit_per_host=pool_size,
+                force_close=False,
+                **_CONNECTOR_SOCKET_KWARGS
+            ),
+            headers={"Connection": "keep-alive"}
+        )
+    
+    def _key_sampler(self, key_count, distribution):
+        """Return a function drawing request keys in [0, key_count) from the given distribution"""
+        keys = range(key_count)
+        if distribution == 'zipf':
+            cum_weights = list(itertools.accumulate(1 / (k + 1) for k in keys))
+            return lambda: self.rng.choices(keys, cum_weights=cum_weights)[0]
+        if distribution == 'gaussian':
+            return lambda: int(self.rng.gauss(key_count / 2, key_count / 6)) % key_count
+        if distribution == 'uniform':
+            return lambda: self.rng.randrange(key_count)
+        raise ValueError(f"Unknown key distribution: {distribution}")
+    
+    async def test_prediction_performance(self, num_tests=100, warmup_requests=10):
+        """Test carbon prediction API performance"""
+        print(f"Testing prediction performance with {num_tests} requests...")
         
-        response_times = []
-        errors = 0
-        
-        for i in range(num_tests):
-            start_time = time.time()
-            try:
-                response = requests.post(
-                    f"{self.base_url}/api/predictions",
-                    json=test_data,
-                    timeout=10
-                )
-                end_time = time.time()
-                
-                if response.status_code == 200:
-                    response_times.append((end_time - start_time) * 1000)  # Convert to ms
-                else:
-                    errors += 1
-                    
-            except Exception as e:
-                errors += 1
-                print(f"Error in request {i}: {e}")
-        
-        if response_times:
-            avg_time = statistics.mean(response_times)
-            median_time = statistics.median(response_times)
-            p95_time = sorted(response_times)[int(len(response_times) * 0.95)]
+        url = f"{self.base_url}/api/predictions"
+        body = self._pred_body
+        
+        # Successful latencies are written by index; failed slots stay NaN
+        times = np.empty(num_tests, dtype=np.float64)
+        times.fill(np.nan)
+        # Keyed by HTTP status code for bad responses and exception name for failed requests
+        errors = Counter()
+        
+        # In-flight requests never exceed the connection pool
+        limit = asyncio.Semaphore(self.max_connections)
+        
+        async with self._client_session() as session:
+            # Warm-up responses are discarded so cold-start latency does not skew the statistics
+            await asyncio.gather(
+                *[_request(session, 'POST', url, body, limit=limit)
+                  for _ in range(warmup_requests)],
+                return_exceptions=True
+            )
+            
+            results = await asyncio.gather(
+                *[_request(session, 'POST', url, body, limit=limit)
+                  for _ in range(num_tests)],
+                return_exceptions=True
+            )
+        
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                errors[type(result).__name__] += 1
+                log.error("Error in request %d: %s", i, result)
+                continue
+            
+            status_code, response_time = result
+            if status_code == 200:
+                times[i] = response_time
+            else:
+                errors[status_code] += 1
+        
+        valid = times[~np.isnan(times)]
+        if valid.size:
+            avg_time = valid.mean()
+            median_time, p90_time, p95_time, p99_time = np.percentile(valid, [50, 90, 95, 99])
             
             self.results['prediction_tests'] = {
                 'total_requests': num_tests,
-                'successful_requests': len(response_times),
-                'errors': errors,
+                'warmup_requests': warmup_requests,
+                'successful_requests': valid.size,
+                'errors': errors.total(),
+                'error_types': dict(errors),
                 'average_response_time_ms': avg_time,
                 'median_response_time_ms': median_time,
+                'p90_response_time_ms': p90_time,
                 'p95_response_time_ms': p95_time,
-                'min_response_time_ms': min(response_times),
-                'max_response_time_ms': max(response_times)
+                'p99_response_time_ms': p99_time,
+                'min_response_time_ms': valid.min(),
+                'max_response_time_ms': valid.max()
             }
             
             print(f"Prediction API Results:")
             print(f"  Average response time: {avg_time:.2f}ms")
             print(f"  Median response time: {median_time:.2f}ms")
             print(f"  95th percentile: {p95_time:.2f}ms")
-            print(f"  Error rate: {(errors/num_tests)*100:.2f}%")
+            print(f"  Error rate: {(errors.total()/num_tests)*100:.2f}%")
+            if errors:
+                print(f"  Errors: {_format_errors(errors)}")
     
-    def test_trading_performance(self, num_orders=50):
+    async def test_trading_performance(self, num_orders=50, warmup_requests=10, batch=True):
         """Test trading order placement performance"""
         print(f"Testing trading performance with {num_orders} orders...")
-        
-        response_times = []
-        errors = 0
-        
-        for i in range(num_orders):
-            order_data = {
-                "orderType": "buy" if i % 2 == 0 else "sell",
-                "quantity": 10 + (i % 20),
-                "price": 20 + (i % 10),
-                "creditId": "test-credit-id"
-            }
+        if not num_orders:
+            return
+        
+        times = np.empty(num_orders, dtype=np.float64)
+        times.fill(np.nan)
+        errors = Counter()
+        
+        def render_order(i):
+            return self._order_templates[i % 2] % (10 + (i % 20), 20 + (i % 10))
+        
+        order_bodies = [render_order(i) for i in range(num_orders)]
+        batch_body = b'{"orders":[' + b','.join(order_bodies) + b']}'
+        url = f"{self.base_url}/api/orders"
+        mode = 'individual'
+        limit = asyncio.Semaphore(self.max_connections)
+        
+        async with self._client_session() as session:
+            await asyncio.gather(
+                *[_request(session, 'POST', url, render_order(i), limit=limit)
+                  for i in range(warmup_requests)],
+                return_exceptions=True
+            )
             
-            start_time = time.time()
-            try:
-                response = requests.post(
-                    f"{self.base_url}/api/orders",
-                    json=order_data,
-                    timeout=10
-                )
-                end_time = time.time()
-                
-                if response.status_code == 200:
-                    response_times.append((end_time - start_time) * 1000)
+            results = []
+            if batch:
+                # Place every order in a single round trip when the server exposes a batch route
+                start_ns = time.perf_counter_ns()
+                try:
+                    batch_status, batch_time = await _request(
+                        session,
+                        'POST',
+                        f"{url}/batch",
+                        batch_body
+                    )
+                except Exception as e:
+                    # Batch support is unknown, so the orders are still placed individually
+                    log.error("Error in order batch, falling back to individual orders: %r", e)
                 else:
-                    errors += 1
-                    
-            except Exception as e:
-                errors += 1
-                print(f"Error in order {i}: {e}")
+                    if 200 <= batch_status < 300:
+                        # Every order in the batch completes with the batch response
+                        mode = 'batch'
+                        times.fill(batch_time)
+                    elif batch_status not in (404, 405):
+                        log.error("Order batch returned %d, falling back to individual orders", batch_status)
+            
+            if mode == 'individual':
+                start_ns = time.perf_counter_ns()
+                results = await asyncio.gather(
+                    *[_request(session, 'POST', url, body, limit=limit)
+                      for body in order_bodies],
+                    return_exceptions=True
+                )
+            duration_seconds = (time.perf_counter_ns() - start_ns) / 1e9
         
-        if response_times:
-            avg_time = statistics.mean(response_times)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                errors[type(result).__name__] += 1
+                log.error("Error in order %d: %s", i, result)
+                continue
             
+            status_code, response_time = result
+            if status_code == 200:
+                times[i] = response_time
+            else:
+                errors[status_code] += 1
+        
+        valid = times[~np.isnan(times)]
+        if valid.size:
+            # Orders are in flight concurrently, so throughput is measured against wall time
             self.results['trading_tests'] = {
                 'total_orders': num_orders,
-                'successful_orders': len(response_times),
-                'errors': errors,
-                'average_response_time_ms': avg_time,
-                'orders_per_second': len(response_times) / (sum(response_times) / 1000)
+                'mode': mode,
+                'warmup_requests': warmup_requests,
+                'successful_orders': valid.size,
+                'errors': errors.total(),
+                'error_types': dict(errors),
+                'orders_per_second': valid.size / duration_seconds
             }
             
-            print(f"Trading API Results:")
-            print(f"  Average response time: {avg_time:.2f}ms")
+            print(f"Trading API Results ({mode} orders):")
+            if mode == 'batch':
+                # One round trip for all orders, not a per-order latency
+                self.results['trading_tests']['batch_response_time_ms'] = batch_time
+                print(f"  Batch response time: {batch_time:.2f}ms")
+            else:
+                avg_time = valid.mean()
+                self.results['trading_tests']['average_response_time_ms'] = avg_time
+                print(f"  Average response time: {avg_time:.2f}ms")
             print(f"  Orders per second: {self.results['trading_tests']['orders_per_second']:.2f}")
-            print(f"  Error rate: {(errors/num_orders)*100:.2f}%")
+            print(f"  Error rate: {(errors.total()/num_orders)*100:.2f}%")
+            if errors:
+                print(f"  Errors: {_format_errors(errors)}")
     
-    def test_concurrent_load(self, concurrent_users=20, requests_per_user=10):
-        """Test system under concurrent load"""
-        print(f"Testing concurrent load: {concurrent_users} users, {requests_per_user} requests each...")
-        
-        def make_requests(user_id):
-            user_results = []
-            for i in range(requests_per_user):
-                start_time = time.time()
+    async def _run_load(self, concurrent_users, requests_per_user, warmup_requests, key_count, distribution):
+        """Run one shard of the load test and return its per-request columns, errors and start/end times"""
+        # Skewed keys exercise the server's cache misses as well as its hot entries
+        next_key = self._key_sampler(key_count, distribution)
+        
+        # Bounds in-flight requests to the number of simulated users
+        sem = asyncio.Semaphore(concurrent_users)
+        
+        predictions_url = f"{self.base_url}/api/predictions"
+        market_data_url = f"{self.base_url}/api/market-data"
+        orders_url = f"{self.base_url}/api/orders"
+        
+        # Parallel per-request columns, filled in place by the request coroutines
+        total_requests = concurrent_users * requests_per_user
+        latencies = np.full(total_requests, np.nan)
+        statuses = np.zeros(total_requests, dtype=np.int32)
+        ok = np.zeros(total_requests, dtype=bool)
+        errors = Counter()
+        
+        # Warm-up requests pass no index and are not recorded
+        async def make_requests(i, session, index=None):
+            # Drawn before awaiting so the key sequence follows scheduling order
+            key = next_key()
+            async with sem:
                 try:
                     # Alternate between different API endpoints
                     if i % 3 == 0:
                         # Prediction request
-                        response = requests.post(
-                            f"{self.base_url}/api/predictions",
-                            json={
-                                "energyUsage": 700 + (user_id * 10),
-                                "transportation": {"weeklyMiles": 80 + (user_id * 5)},
+                        status_code, response_time = await _request(
+                            session,
+                            'POST',
+                            predictions_url,
+                            orjson.dumps({
+                                "energyUsage": 700 + key,
+                                "transportation": {"weeklyMiles": 80 + (key % 200)},
                                 "diet": "mixed",
-                                "householdSize": 2 + (user_id % 3)
-                            },
+                                "householdSize": 2 + (key % 3)
+                            }),
                             timeout=15
                         )
                     elif i % 3 == 1:
                         # Market data request
-                        response = requests.get(
-                            f"{self.base_url}/api/market-data",
+                        status_code, response_time = await _request(
+                            session,
+                            'GET',
+                            market_data_url,
                             timeout=15
                         )
                     else:
                         # Order placement
-                        response = requests.post(
-                            f"{self.base_url}/api/orders",
-                            json={
+                        status_code, response_time = await _request(
+                            session,
+                            'POST',
+                            orders_url,
+                            orjson.dumps({
                                 "orderType": "buy",
-                                "quantity": 5 + (user_id % 10),
-                                "price": 25 + (user_id % 5),
-                                "creditId": f"credit-{user_id}"
-                            },
+                                "quantity": 5 + (key % 10),
+                                "price": 25 + (key % 5),
+                                "creditId": f"credit-{key}"
+                            }),
                             timeout=15
                         )
                     
-                    end_time = time.time()
-                    user_results.append({
-                        'response_time': (end_time - start_time) * 1000,
-                        'status_code': response.status_code,
-                        'success': response.status_code == 200
-                    })
+                    if index is not None:
+                        statuses[index] = status_code
+                        if status_code == 200:
+                            latencies[index] = response_time
+                            ok[index] = True
+                        else:
+                            errors[status_code] += 1
                     
                 except Exception as e:
-                    user_results.append({
-                        'response_time': None,
-                        'status_code': None,
-                        'success': False,
-                        'error': str(e)
-                    })
-            
-            return user_results
+                    if index is not None:
+                        errors[type(e).__name__] += 1
         
-        # Execute concurrent requests
-        start_time = time.time()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_users) as executor:
-            futures = [executor.submit(make_requests, user_id) for user_id in range(concurrent_users)]
-            all_results = []
+        # One persistent connection per simulated user
+        async with self._client_session(pool_size=concurrent_users) as session:
+            # Warm up across all endpoints and discard the results
+            await asyncio.gather(*[make_requests(i, session) for i in range(warmup_requests)])
             
-            for future in concurrent.futures.as_completed(futures):
-                all_results.extend(future.result())
+            # Execute concurrent requests, each user owning a contiguous slice of the results.
+            # monotonic_ns is system-wide, so timestamps from shards in other processes are comparable
+            start_ns = time.monotonic_ns()
+            await asyncio.gather(
+                *[make_requests(i, session, user_id * requests_per_user + i)
+                  for user_id in range(concurrent_users)
+                  for i in range(requests_per_user)]
+            )
+            end_ns = time.monotonic_ns()
+        
+        return latencies, statuses, ok, errors, start_ns, end_ns
+    
+    async def test_concurrent_load(self, concurrent_users=20, requests_per_user=10, warmup_requests=10,
+                                   key_count=1000, distribution='zipf', processes=1):
+        """Test system under concurrent load, optionally sharding users across processes"""
+        # With no users the request semaphore could never be acquired
+        if concurrent_users < 1:
+            raise ValueError("concurrent_users must be at least 1")
+        
+        print(f"Testing concurrent load: {concurrent_users} users, {requests_per_user} requests each...")
         
-        end_time = time.time()
+        # Default to one process per core, never more processes than users
+        processes = max(1, min(processes or os.cpu_count() or 1, concurrent_users))
+        
+        if processes == 1:
+            shards = [await self._run_load(
+                concurrent_users, requests_per_user, warmup_requests, key_count, distribution
+            )]
+        else:
+            # Each process gets its own GIL, event loop and connection pool, plus a distinct key seed
+            users_per_process = [
+                concurrent_users // processes + (1 if n < concurrent_users % processes else 0)
+                for n in range(processes)
+            ]
+            loop = asyncio.get_running_loop()
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                shards = await asyncio.gather(*[
+                    loop.run_in_executor(executor, _load_worker, (
+                        self.base_url, self.max_connections, self.seed + n,
+                        users, requests_per_user, warmup_requests, key_count, distribution
+                    ))
+                    for n, users in enumerate(users_per_process)
+                ])
+        
+        latencies = np.concatenate([shard[0] for shard in shards])
+        statuses = np.concatenate([shard[1] for shard in shards])
+        ok = np.concatenate([shard[2] for shard in shards])
+        errors = sum((shard[3] for shard in shards), Counter())
+        # Shards start at different times, so the load spans the earliest start to the latest end
+        duration_seconds = (max(shard[5] for shard in shards) - min(shard[4] for shard in shards)) / 1e9
+        total_requests = concurrent_users * requests_per_user
         
         # Analyze results
-        successful_requests = [r for r in all_results if r['success']]
-        failed_requests = [r for r in all_results if not r['success']]
-        response_times = [r['response_time'] for r in successful_requests if r['response_time']]
+        successful_requests = int(ok.sum())
+        failed_requests = total_requests - successful_requests
+        times = latencies[ok]
         
-        if response_times:
+        if times.size:
+            median_time, p90_time, p95_time, p99_time = np.percentile(times, [50, 90, 95, 99])
+            
             self.results['load_tests'] = {
                 'concurrent_users': concurrent_users,
-                'total_requests': len(all_results),
-                'successful_requests': len(successful_requests),
-                'failed_requests': len(failed_requests),
-                'total_duration_seconds': end_time - start_time,
-                'requests_per_second': len(all_results) / (end_time - start_time),
-                'average_response_time_ms': statistics.mean(response_times),
-                'median_response_time_ms': statistics.median(response_times),
-                'p95_response_time_ms': sorted(response_times)[int(len(response_times) * 0.95)],
-                'error_rate_percent': (len(failed_requests) / len(all_results)) * 100
+                'processes': processes,
+                'key_distribution': distribution,
+                'key_count': key_count,
+                'total_requests': total_requests,
+                # Every shard warms up its own connection pool
+                'warmup_requests': warmup_requests * processes,
+                'successful_requests': successful_requests,
+                'failed_requests': failed_requests,
+                'total_duration_seconds': duration_seconds,
+                'requests_per_second': total_requests / duration_seconds,
+                'average_response_time_ms': times.mean(),
+                'median_response_time_ms': median_time,
+                'p90_response_time_ms': p90_time,
+                'p95_response_time_ms': p95_time,
+                'p99_response_time_ms': p99_time,
+                'error_rate_percent': (failed_requests / total_requests) * 100,
+                'error_types': dict(errors),
+                # Raw per-request samples, serialised as one array per column
+                'samples': {
+                    'latency_ms': latencies,
+                    'status': statuses,
+                    'ok': ok
+                }
             }
             
             print(f"Load Test Results:")
-            print(f"  Total requests: {len(all_results)}")
+            print(f"  Total requests: {total_requests}")
             print(f"  Requests per second: {self.results['load_tests']['requests_per_second']:.2f}")
             print(f"  Average response time: {self.results['load_tests']['average_response_time_ms']:.2f}ms")
             print(f"  95th percentile: {self.results['load_tests']['p95_response_time_ms']:.2f}ms")
             print(f"  Error rate: {self.results['load_tests']['error_rate_percent']:.2f}%")
+            if errors:
+                print(f"  Errors: {_format_errors(errors)}")
     
-    def test_api_endpoints(self):
-        """Test all API endpoints for basic functionality"""
-        print("Testing API endpoints...")
+    async def test_api_endpoints(self, samples=20):
+        """Test all API endpoints for basic functionality and per-endpoint latency"""
+        print(f"Testing API endpoints with {samples} samples each...")
         
         endpoints = [
             {'method': 'GET', 'path': '/health', 'expected_status': 200},
@@ -226,44 +496,63 @@ class PerformanceTester:
             {'method': 'GET', 'path': '/api/carbon-credits', 'expected_status': 200},
         ]
         
-        results = []
-        
-        for endpoint in endpoints:
-            start_time = time.time()
-            try:
-                if endpoint['method'] == 'GET':
-                    response = requests.get(f"{self.base_url}{endpoint['path']}", timeout=10)
-                else:
-                    response = requests.post(f"{self.base_url}{endpoint['path']}", timeout=10)
-                
-                end_time = time.time()
-                
-                results.append({
-                    'endpoint': endpoint['path'],
-                    'method': endpoint['method'],
-                    'status_code': response.status_code,
-                    'response_time_ms': (end_time - start_time) * 1000,
-                    'success': response.status_code == endpoint['expected_status']
-                })
+        results = {}
+        urls = [f"{self.base_url}{endpoint['path']}" for endpoint in endpoints]
+        
+        # All samples of all endpoints are scheduled together, bounded by the connection pool
+        limit = asyncio.Semaphore(self.max_connections)
+        async with self._client_session() as session:
+            responses = await asyncio.gather(
+                *[_request(session, endpoint['method'], url, limit=limit)
+                  for endpoint, url in zip(endpoints, urls)
+                  for _ in range(samples)],
+                return_exceptions=True
+            )
+        
+        for n, endpoint in enumerate(endpoints):
+            times = np.empty(samples, dtype=np.float64)
+            times.fill(np.nan)
+            status_code = None
+            error = None
+            
+            for i, response in enumerate(responses[n * samples:(n + 1) * samples]):
+                if isinstance(response, Exception):
+                    error = str(response)
+                    continue
                 
-            except Exception as e:
-                results.append({
-                    'endpoint': endpoint['path'],
-                    'method': endpoint['method'],
-                    'status_code': None,
-                    'response_time_ms': None,
-                    'success': False,
-                    'error': str(e)
-                })
+                status_code, response_time = response
+                if status_code == endpoint['expected_status']:
+                    times[i] = response_time
+            
+            valid = times[~np.isnan(times)]
+            result = {
+                'method': endpoint['method'],
+                'status_code': status_code,
+                'samples': samples,
+                'successful_samples': valid.size,
+                'success': valid.size == samples
+            }
+            if valid.size:
+                p50_time, p95_time = np.percentile(valid, [50, 95])
+                result['min_response_time_ms'] = valid.min()
+                result['p50_response_time_ms'] = p50_time
+                result['p95_response_time_ms'] = p95_time
+            if error:
+                result['error'] = error
+            
+            results[endpoint['path']] = result
         
         self.results['api_tests'] = results
         
         print("API Endpoint Results:")
-        for result in results:
+        for path, result in results.items():
             status = "✓" if result['success'] else "✗"
-            print(f"  {status} {result['method']} {result['endpoint']}: {result.get('status_code', 'ERROR')}")
+            summary = f"{result['status_code'] or 'ERROR'} ({result['successful_samples']}/{samples} ok"
+            if result['successful_samples']:
+                summary += f", p50 {result['p50_response_time_ms']:.2f}ms, p95 {result['p95_response_time_ms']:.2f}ms"
+            print(f"  {status} {result['method']} {path}: {summary})")
     
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run complete performance test suite"""
         print("=" * 60)
         print("Carbon Footprint Marketplace Performance Tests")
@@ -271,14 +560,17 @@ class PerformanceTester:
         print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print()
         
-        # Run all test suites
-        self.test_api_endpoints()
+        # Only the functional endpoint check overlaps a benchmark; the benchmarks run one
+        # after the other so neither shares the server with the other's connection pool
+        await asyncio.gather(
+            self.test_api_endpoints(),
+            self.test_prediction_performance(100)
+        )
         print()
-        self.test_prediction_performance(100)
+        await self.test_trading_performance(50)
         print()
-        self.test_trading_performance(50)
-        print()
-        self.test_concurrent_load(20, 10)
+        # The load test runs alone so its throughput is not shared with other traffic
+        await self.test_concurrent_load(20, 10)
         print()
         
         # Generate summary report
@@ -286,33 +578,47 @@ class PerformanceTester:
     
     def generate_report(self):
         """Generate comprehensive performance report"""
+        api_results = self.results.get('api_tests') or {}
+        pred_results = self.results.get('prediction_tests') or {}
+        trade_results = self.results.get('trading_tests') or {}
+        load_results = self.results.get('load_tests') or {}
+        
+        # Nothing to summarise or save when every test failed to collect data;
+        # endpoint entries are always present, so they only count once a sample succeeded
+        api_collected = any(r['successful_samples'] for r in api_results.values())
+        if not any((api_collected, pred_results, trade_results, load_results)):
+            print("No performance data collected - skipping report")
+            return
+        
         print("=" * 60)
         print("PERFORMANCE TEST SUMMARY")
         print("=" * 60)
         
         # API Health Check
-        api_results = self.results.get('api_tests', [])
-        healthy_endpoints = sum(1 for r in api_results if r['success'])
+        healthy_endpoints = sum(1 for r in api_results.values() if r['success'])
         print(f"API Health: {healthy_endpoints}/{len(api_results)} endpoints healthy")
         
         # Prediction Performance
-        pred_results = self.results.get('prediction_tests', {})
         if pred_results:
             print(f"Prediction API: {pred_results['average_response_time_ms']:.2f}ms avg response")
             print(f"  Success rate: {(pred_results['successful_requests']/pred_results['total_requests'])*100:.1f}%")
+            print(f"  Warm-up requests excluded: {pred_results['warmup_requests']}")
         
         # Trading Performance
-        trade_results = self.results.get('trading_tests', {})
         if trade_results:
-            print(f"Trading API: {trade_results['average_response_time_ms']:.2f}ms avg response")
+            if trade_results['mode'] == 'batch':
+                print(f"Trading API (batch orders): {trade_results['batch_response_time_ms']:.2f}ms batch response")
+            else:
+                print(f"Trading API (individual orders): {trade_results['average_response_time_ms']:.2f}ms avg response")
             print(f"  Throughput: {trade_results['orders_per_second']:.2f} orders/sec")
+            print(f"  Warm-up requests excluded: {trade_results['warmup_requests']}")
         
         # Load Test Results
-        load_results = self.results.get('load_tests', {})
         if load_results:
             print(f"Load Test: {load_results['requests_per_second']:.2f} req/sec")
             print(f"  Error rate: {load_results['error_rate_percent']:.2f}%")
             print(f"  95th percentile: {load_results['p95_response_time_ms']:.2f}ms")
+            print(f"  Warm-up requests excluded: {load_results['warmup_requests']}")
         
         # Performance Recommendations
         print("\nRECOMMENDations:")
@@ -322,40 +628,50 @@ class PerformanceTester:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"performance_report_{timestamp}.json"
         
-        with open(filename, 'w') as f:
-            json.dump({
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps({
                 'timestamp': datetime.now().isoformat(),
                 'results': self.results
-            }, f, indent=2)
+            }, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
         
         print(f"\nDetailed results saved to: {filename}")
     
     def generate_recommendations(self):
         """Generate performance improvement recommendations"""
         recommendations = []
+        pred_results = self.results.get('prediction_tests') or {}
+        trade_results = self.results.get('trading_tests') or {}
+        load_results = self.results.get('load_tests') or {}
+        api_results = self.results.get('api_tests') or {}
         
         # Check prediction performance
-        pred_results = self.results.get('prediction_tests', {})
-        if pred_results and pred_results.get('average_response_time_ms', 0) > 500:
+        if pred_results.get('average_response_time_ms', 0) > 500:
             recommendations.append("• Prediction API is slow (>500ms) - consider caching or optimization")
         
         # Check trading performance
-        trade_results = self.results.get('trading_tests', {})
         if trade_results and trade_results.get('orders_per_second', 0) < 10:
             recommendations.append("• Trading throughput is low (<10 orders/sec) - optimize order processing")
         
         # Check load test results
-        load_results = self.results.get('load_tests', {})
-        if load_results:
-            if load_results.get('error_rate_percent', 0) > 5:
-                recommendations.append("• High error rate under load (>5%) - improve error handling")
-            
-            if load_results.get('p95_response_time_ms', 0) > 2000:
-                recommendations.append("• High 95th percentile response time (>2s) - optimize slow queries")
+        if load_results.get('error_rate_percent', 0) > 5:
+            recommendations.append("• High error rate under load (>5%) - improve error handling")
+        
+        if load_results.get('p95_response_time_ms', 0) > 2000:
+            recommendations.append("• High 95th percentile response time (>2s) - optimize slow queries")
+        
+        # Check error types across all request tests
+        errors = Counter()
+        for test_results in (pred_results, trade_results, load_results):
+            errors.update(test_results.get('error_types', {}))
+        if errors[429]:
+            recommendations.append(f"• {errors[429]} requests rate limited (429) - raise server limits or throttle clients")
+        if errors[503] or errors[504]:
+            recommendations.append(f"• {errors[503] + errors[504]} requests hit 503/504 - scale capacity or check upstream timeouts")
+        if errors['TimeoutError']:
+            recommendations.append(f"• {errors['TimeoutError']} requests timed out - investigate slow handlers under load")
         
         # API health check
-        api_results = self.results.get('api_tests', [])
-        failed_apis = [r for r in api_results if not r['success']]
+        failed_apis = [path for path, r in api_results.items() if not r['success']]
         if failed_apis:
             recommendations.append(f"• {len(failed_apis)} API endpoints failing - check service health")
         
@@ -368,4 +684,4 @@ class PerformanceTester:
 if __name__ == "__main__":
     # Run performance tests
     tester = PerformanceTester()
-    tester.run_all_tests()
\ No newline at end of file
+    run_async(tester.run_all_tests())
\ No newline at end of file